@@ -10,23 +10,33 @@
 #     given Military Occupational Specialty (MOS).
 #
 #  ARCHITECTURE:
-#  - Stateless: The application itself does not hold any state between
+#  - Stateless: The application itself does not hold any user state between
 #    requests, making it suitable for deployment with multiple worker
 #    processes (e.g., using a WSGI server like Gunicorn).
 #  - Configuration over Code: Key settings like the database path are loaded
 #    from environment variables, not hardcoded. This is managed by `python-dotenv`.
-#  - Database Management: Database connections are opened on a per-request
-#    basis and closed automatically after the request is handled. This is a
-#    robust pattern for managing resources in a web application.
+#  - Database Management: Each request checks a database connection out of a
+#    small per-process pool and returns it automatically after the request is
+#    handled. Reusing connections avoids re-opening the database files and
+#    keeps SQLite's page cache warm between requests.
 #
 # ==============================================================================
 
 import os
+import queue
 import sqlite3
-from flask import Flask, render_template, g, jsonify, request, session
-from werkzeug.security import check_password_hash, generate_password_hash
+import threading
+import time
+from flask import Flask, Response, render_template, g, request, session
+from werkzeug.local import LocalProxy
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from dotenv import load_dotenv
 import functools
+import gzip
+import hashlib
+import orjson
 
 # --- Application Setup ---
 
@@ -40,7 +50,14 @@ app = Flask(__name__)
 # Flask aware of the 'instance' folder.
 app.config.from_mapping(
     SECRET_KEY=os.getenv('SECRET_KEY', 'dev'), # Default 'dev' key is for development only
-    DATABASE=os.path.join(app.instance_path, os.getenv('DATABASE_PATH', 'database.sqlite'))
+    DATABASE=os.path.join(app.instance_path, os.getenv('DATABASE_PATH', 'database.sqlite')),
+    # Argon2 cost parameters: iterations and memory in KiB. The test suite
+    # lowers these so that registering and logging in stay fast. Every hash
+    # in progress holds its full memory cost (64 MiB by default), so peak
+    # memory for concurrent logins is workers x threads x memory cost; see
+    # `gunicorn.conf.py` before raising it or the Gunicorn concurrency.
+    PASSWORD_HASH_TIME_COST=2,
+    PASSWORD_HASH_MEMORY_COST=65536
 )
 
 # --- Security Warning for Default Key in Production ---
@@ -51,6 +68,85 @@ app.config.from_mapping(
 if os.getenv('FLASK_ENV') == 'production' and app.config['SECRET_KEY'] == 'dev':
     app.logger.warning('CRITICAL SECURITY WARNING: The default SECRET_KEY is in use in a production environment. Please set a strong, unique key in your .env file.')
 
+# --- JSON Responses ---
+
+def json_response(obj, status=200, mimetype='application/json'):
+    """
+    Serializes `obj` with orjson and wraps it in a `Response`.
+
+    This replaces Flask's `jsonify`, which goes through the standard library
+    encoder. orjson is considerably faster, which matters most for the skill
+    lists returned by the API.
+    """
+    return Response(orjson.dumps(obj), status=status, mimetype=mimetype)
+
+# --- SQL Statements ---
+#
+# Every query the app runs is defined once here. sqlite3 keeps a per-connection
+# cache of prepared statements keyed by the SQL text, so always executing the
+# same constant (never an f-string) means each statement is parsed and planned
+# once per pooled connection rather than once per request.
+
+SQL_INSERT_USER = "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+SQL_SELECT_USER_BY_USERNAME = "SELECT id, password_hash FROM users WHERE username = ?"
+SQL_SELECT_USER_BY_ID = "SELECT id, username FROM users WHERE id = ?"
+SQL_UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE id = ?"
+SQL_SELECT_MOS_PAYLOADS = (
+    "SELECT mos_code, title, skills_json FROM occupations"
+    " WHERE skills_json IS NOT NULL"
+)
+SQL_SELECT_OCCUPATION_COLUMNS = "SELECT name FROM pragma_table_info('occupations')"
+SQL_ADD_SKILLS_JSON_COLUMN = "ALTER TABLE occupations ADD COLUMN skills_json TEXT"
+SQL_SELECT_SKILLS_IN_ORDER = "SELECT occupation_id, description FROM skills ORDER BY id"
+SQL_UPDATE_SKILLS_JSON = "UPDATE occupations SET skills_json = ? WHERE id = ?"
+SQL_SELECT_INDEX_NAMES = "SELECT name FROM sqlite_master WHERE type = 'index'"
+# The indexes created by `scripts/import_data.py`, keyed by name.
+SQL_CREATE_INDEXES = {
+    'idx_skills_occupation_id':
+        "CREATE INDEX IF NOT EXISTS idx_skills_occupation_id ON skills (occupation_id)",
+    'idx_user_saved_skills_user_id':
+        "CREATE INDEX IF NOT EXISTS idx_user_saved_skills_user_id ON user_saved_skills (user_id)",
+}
+SQL_SELECT_SCHEMA_VERSION = "PRAGMA schema_version"
+SQL_INSERT_SAVED_SKILL = "INSERT INTO user_saved_skills (user_id, skill_description) VALUES (?, ?)"
+SQL_SELECT_SAVED_SKILLS = "SELECT id, skill_description FROM user_saved_skills WHERE user_id = ?"
+SQL_DELETE_SAVED_SKILL = "DELETE FROM user_saved_skills WHERE id = ? AND user_id = ?"
+
+# --- Password Hashing ---
+#
+# Passwords are hashed with Argon2id through the native argon2-cffi bindings.
+# Accounts created before the switch still carry werkzeug hashes; these are
+# verified with werkzeug and transparently re-hashed on the next login.
+
+@functools.lru_cache(maxsize=None)
+def _password_hasher(time_cost, memory_cost):
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=1)
+
+def get_password_hasher():
+    """Returns the Argon2 hasher for the configured cost parameters."""
+    return _password_hasher(
+        app.config['PASSWORD_HASH_TIME_COST'],
+        app.config['PASSWORD_HASH_MEMORY_COST'],
+    )
+
+LEGACY_HASH_PREFIXES = ('pbkdf2:', 'scrypt:')
+
+def verify_password(password_hash, password):
+    """Returns True if `password` matches the stored `password_hash`."""
+    if password_hash.startswith(LEGACY_HASH_PREFIXES):
+        return check_password_hash(password_hash, password)
+    try:
+        return get_password_hasher().verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(password_hash):
+    """Returns True if the stored hash is a legacy or outdated Argon2 hash."""
+    return (
+        password_hash.startswith(LEGACY_HASH_PREFIXES)
+        or get_password_hasher().check_needs_rehash(password_hash)
+    )
+
 # --- Auth Blueprint and Routes ---
 
 @app.route('/api/register', methods=['POST'])
@@ -69,17 +165,19 @@ def register():
 
     if error is None:
         try:
-            db.execute(
-                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-                (username, generate_password_hash(password)),
-            )
-            db.commit()
+            # The connection's context manager commits on success and rolls
+            # back if the statement fails.
+            with db:
+                db.execute(
+                    SQL_INSERT_USER,
+                    (username, get_password_hasher().hash(password)),
+                )
         except db.IntegrityError:
             error = f"User {username} is already registered."
         else:
-            return jsonify({'message': 'User created successfully'}), 201
+            return json_response({'message': 'User created successfully'}, 201)
 
-    return jsonify({'error': error}), 400
+    return json_response({'error': error}, 400)
 
 @app.route('/api/login', methods=['POST'])
 def login():
@@ -89,91 +187,350 @@ def login():
     password = data.get('password')
     db = get_db()
     error = None
-    user = db.execute(
-        'SELECT * FROM users WHERE username = ?', (username,)
-    ).fetchone()
+    user = db.execute(SQL_SELECT_USER_BY_USERNAME, (username,)).fetchone()
 
     if user is None:
         error = 'Incorrect username.'
-    elif not check_password_hash(user['password_hash'], password):
+    elif not verify_password(user['password_hash'], password):
         error = 'Incorrect password.'
 
     if error is None:
+        if password_needs_rehash(user['password_hash']):
+            with db:
+                db.execute(SQL_UPDATE_PASSWORD_HASH, (get_password_hasher().hash(password), user['id']))
+
         session.clear()
         session['user_id'] = user['id']
-        return jsonify({'message': 'Logged in successfully'})
+        return json_response({'message': 'Logged in successfully'})
 
-    return jsonify({'error': error}), 400
+    return json_response({'error': error}, 400)
 
 @app.route('/api/logout')
 def logout():
     """Logs the current user out."""
     session.clear()
-    return jsonify({'message': 'Logged out successfully'})
+    return json_response({'message': 'Logged out successfully'})
 
-@app.before_request
-def load_logged_in_user():
-    """If a user id is in the session, load the user object from the db."""
-    user_id = session.get('user_id')
+def get_current_user():
+    """
+    Returns the logged-in user's row, or None for anonymous requests.
 
-    if user_id is None:
-        g.user = None
-    else:
-        g.user = get_db().execute(
-            'SELECT * FROM users WHERE id = ?', (user_id,)
-        ).fetchone()
+    The user is loaded lazily: the database is only queried the first time a
+    request asks for it, and the result is kept on `g` for the rest of that
+    request. Routes that never look at the user, like the public MOS API,
+    therefore cost no extra query.
+    """
+    if 'user' not in g:
+        user_id = session.get('user_id')
+
+        if user_id is None:
+            g.user = None
+        else:
+            g.user = get_db().execute(SQL_SELECT_USER_BY_ID, (user_id,)).fetchone()
+    return g.user
+
+@app.context_processor
+def inject_current_user():
+    """
+    Makes the logged-in user available to templates as `current_user`.
+
+    The user is passed as a proxy, so it is only loaded if the template
+    actually uses it. Pages that never show the user cost no extra query.
+    """
+    return {'current_user': LocalProxy(get_current_user)}
 
 def login_required(view):
     """View decorator that redirects anonymous users to the login page."""
     @functools.wraps(view)
     def wrapped_view(**kwargs):
-        if g.user is None:
-            return jsonify({'error': 'Authorization required'}), 401
+        if get_current_user() is None:
+            return json_response({'error': 'Authorization required'}, 401)
         return view(**kwargs)
     return wrapped_view
 
 
 # --- Database Connection Management ---
 
+# Open connections are kept in one LIFO pool per database path, so the most
+# recently used (and therefore warmest) connection is handed out first. The
+# pool is keyed by path because tests may point the app at another database
+# after import.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+_db_pools = {}
+_db_pools_lock = threading.Lock()
+
+def _is_uri(database):
+    """Returns True if `database` is a `file:` URI rather than a plain path."""
+    return database.startswith('file:')
+
+def _is_memory_database(database):
+    """Returns True if `database` names an in-memory database."""
+    return database == ':memory:' or (_is_uri(database) and 'mode=memory' in database)
+
+def _connect(database):
+    """
+    Opens a new connection to `database` and configures it for the app.
+
+    `database` may be a file path or a `file:` URI (for example a shared
+    in-memory database, as used by the test suite). Connections are created
+    with `check_same_thread=False` because a pooled connection may be handed
+    to a different worker thread on its next use.
+    """
+    conn = sqlite3.connect(
+        database,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,
+        cached_statements=256,
+        uri=_is_uri(database)
+    )
+    conn.row_factory = sqlite3.Row
+
+    # Give each connection a 20 MB page cache (negative values are in KiB),
+    # enough to hold the whole occupations/skills working set. Since
+    # connections are pooled, the cache stays warm across requests.
+    conn.execute("PRAGMA cache_size=-20000")
+
+    # Tune the connection for a read-heavy workload. WAL mode lets the
+    # public read endpoints proceed while a writer (register, saved
+    # skills) is committing, and synchronous=NORMAL is durable enough
+    # in WAL mode while needing only one fsync per commit. WAL is not
+    # supported for in-memory databases, so those are left untouched.
+    if not _is_memory_database(database):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+def _get_pool(database):
+    """Returns the connection pool for `database`, creating it on first use."""
+    pool = _db_pools.get(database)
+    if pool is None:
+        with _db_pools_lock:
+            pool = _db_pools.setdefault(database, queue.LifoQueue(maxsize=DB_POOL_SIZE))
+    return pool
+
+def reset_db_pools():
+    """
+    Forgets every pooled connection without using it.
+
+    Gunicorn calls this in each freshly forked worker (see `gunicorn.conf.py`)
+    so a worker never shares a SQLite connection, and its file descriptors,
+    with the master process it was forked from.
+    """
+    with _db_pools_lock:
+        _db_pools.clear()
+
 def get_db():
     """
     Establishes and retrieves the database connection for the current request.
 
     This function uses Flask's application context (`g`) to store the database
-    connection. This ensures that the connection is created only once per
+    connection. This ensures that the connection is checked out only once per
     request and is available to any part of the application logic that needs it.
-    Using `sqlite3.Row` as the `row_factory` allows accessing query results
-    like dictionaries (e.g., row['column_name']), which is more readable.
+    An idle connection is taken from the pool when one is available; otherwise
+    a new one is opened. If `DATABASE_CONNECTION` is configured, that
+    connection is used instead of the pool; the test suite uses this to run
+    each test inside a transaction it rolls back afterwards. Using
+    `sqlite3.Row` as the `row_factory` allows accessing query results like
+    dictionaries (e.g., row['column_name']), which is more readable.
     """
     if 'db' not in g:
+        if app.config.get('DATABASE_CONNECTION') is not None:
+            g.db = app.config['DATABASE_CONNECTION']
+            return g.db
+
+        pool = _get_pool(app.config['DATABASE'])
         try:
-            g.db = sqlite3.connect(
-                app.config['DATABASE'],
-                detect_types=sqlite3.PARSE_DECLTYPES
-            )
-            g.db.row_factory = sqlite3.Row
-        except sqlite3.OperationalError as e:
-            # This is a critical error, often meaning the database file or path
-            # doesn't exist or has permission issues.
-            app.logger.error(f"Database connection failed: {e}")
-            # In a real app, you might want a more user-friendly error page.
-            # For this API-focused app, we let it fail loudly during development.
-            raise
+            g.db = pool.get_nowait()
+        except queue.Empty:
+            try:
+                g.db = _connect(app.config['DATABASE'])
+            except sqlite3.OperationalError as e:
+                # This is a critical error, often meaning the database file or path
+                # doesn't exist or has permission issues.
+                app.logger.error(f"Database connection failed: {e}")
+                # In a real app, you might want a more user-friendly error page.
+                # For this API-focused app, we let it fail loudly during development.
+                raise
+        g.db_pool = pool
     return g.db
 
 @app.teardown_appcontext
 def close_db(e=None):
     """
-    Closes the database connection at the end of the request.
+    Returns the database connection to the pool at the end of the request.
 
     Flask automatically calls this function after a request has been handled,
-    ensuring that the database connection is always closed, even if an error
-    occurred. This prevents resource leaks.
+    even if an error occurred. Any transaction left open by the request is
+    rolled back so the next user of the connection starts clean. If the pool
+    is already full, or the connection is no longer usable, it is closed
+    instead. This prevents resource leaks.
     """
     db = g.pop('db', None)
-    if db is not None:
+    pool = g.pop('db_pool', None)
+    if db is None or pool is None:
+        # Nothing was checked out, or the connection came from
+        # `DATABASE_CONNECTION` and is managed by whoever configured it.
+        return
+
+    try:
+        db.rollback()
+        pool.put_nowait(db)
+    except (sqlite3.Error, queue.Full):
         db.close()
 
+# --- Cached Reference Data ---
+#
+# The occupations and skills tables are only written by `scripts/import_data.py`,
+# so they are effectively static while the server is running. The occupations
+# list is exported to `static/occupations.json` by the import script and served
+# as a static file; the per-MOS API responses are cached in-process, and each
+# worker process rebuilds them by itself shortly after the data is re-imported.
+
+OCCUPATIONS_ASSET = 'occupations.json' # Written to `static/` by the import script
+OCCUPATIONS_ASSET_MAX_AGE = 3600 # Seconds browsers and proxies may cache it
+MOS_RESPONSE_MAX_AGE = 300 # Seconds clients may reuse a /api/mos response
+MOS_DATA_CHECK_INTERVAL = 5 # Seconds between checks for re-imported data
+
+# The whole MOS dataset is small (a few hundred codes at most), so the finished
+# `/api/mos/<mos_code>` response bodies are built once per database and kept in
+# a dict. A lookup is then a single dict access with no SQL at all. Each entry
+# maps a database to a `(schema_version, payloads, next_check)` tuple.
+_mos_payloads = {}
+_mos_payloads_lock = threading.Lock()
+
+def _has_skills_json(conn):
+    """Returns True if the `occupations` table has the `skills_json` column."""
+    return any(name == 'skills_json' for (name,) in conn.execute(SQL_SELECT_OCCUPATION_COLUMNS))
+
+def _has_indexes(conn):
+    """Returns True if every index in `SQL_CREATE_INDEXES` exists."""
+    names = {name for (name,) in conn.execute(SQL_SELECT_INDEX_NAMES)}
+    return names.issuperset(SQL_CREATE_INDEXES)
+
+def _upgrade_schema(conn):
+    """
+    Brings a database created by an older import script up to date.
+
+    Older databases are upgraded in place rather than re-imported, since the
+    import script rebuilds every table and would drop all user accounts and
+    saved skills. A missing `occupations.skills_json` column is added and
+    filled from the normalized `skills` table, keeping each occupation's
+    skills in import order. Missing indexes are created, and the query
+    planner statistics refreshed so that they are used. The checks are
+    repeated inside a write transaction, so if several processes start at
+    once only the first one performs the upgrade.
+    """
+    if _has_skills_json(conn) and _has_indexes(conn):
+        return
+
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if _has_skills_json(conn) and _has_indexes(conn):
+            return
+
+        if not _has_skills_json(conn):
+            conn.execute(SQL_ADD_SKILLS_JSON_COLUMN)
+
+            skills = {}
+            for occupation_id, description in conn.execute(SQL_SELECT_SKILLS_IN_ORDER):
+                skills.setdefault(occupation_id, []).append(description)
+            conn.executemany(
+                SQL_UPDATE_SKILLS_JSON,
+                [(orjson.dumps(descriptions).decode(), occupation_id)
+                 for occupation_id, descriptions in skills.items()]
+            )
+
+        for statement in SQL_CREATE_INDEXES.values():
+            conn.execute(statement)
+        conn.execute("ANALYZE")
+    app.logger.info("Upgraded the database schema.")
+
+def _load_mos_payloads(database):
+    """
+    Builds the response bodies and ETag for every MOS code in `database`.
+
+    Returns the database's schema version, and a dict mapping each MOS code
+    to a `(body, gzip_body, etag)` tuple, where `gzip_body` is the same JSON
+    already gzip-compressed for clients that accept it. The skills are stored
+    pre-serialized as a JSON array on the occupation row, and are spliced into
+    the body as-is rather than decoded only to be encoded again. Occupations
+    that have no skills imported are left out, so they are reported as not
+    found. A database created by an older import script is upgraded first
+    (see `_upgrade_schema`).
+    """
+    payloads = {}
+    conn = sqlite3.connect(database, uri=_is_uri(database))
+    try:
+        _upgrade_schema(conn)
+        schema_version = conn.execute(SQL_SELECT_SCHEMA_VERSION).fetchone()[0]
+        for mos_code, title, skills_json in conn.execute(SQL_SELECT_MOS_PAYLOADS):
+            body = b'{"title":%s,"skills":%s}' % (orjson.dumps(title), skills_json.encode())
+            gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+            etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            payloads[mos_code] = (body, gzip_body, etag)
+    finally:
+        conn.close()
+    return schema_version, payloads
+
+def _read_schema_version(database):
+    """Returns the current schema version of `database`."""
+    conn = sqlite3.connect(database, uri=_is_uri(database))
+    try:
+        return conn.execute(SQL_SELECT_SCHEMA_VERSION).fetchone()[0]
+    finally:
+        conn.close()
+
+def get_mos_payloads():
+    """
+    Returns the prebuilt MOS responses for the configured database.
+
+    At most once every `MOS_DATA_CHECK_INTERVAL` seconds, the database's
+    schema version is compared with the one the responses were built from.
+    The import script drops and recreates every table, which always changes
+    the schema version, so every worker rebuilds its responses within a few
+    seconds of a re-import without needing a restart. Ordinary writes, such
+    as new users or saved skills, leave the schema version unchanged. If the
+    check itself fails, the existing responses are kept until the next one.
+    """
+    database = app.config['DATABASE']
+    entry = _mos_payloads.get(database)
+    now = time.monotonic()
+    if entry is None or now >= entry[2]:
+        with _mos_payloads_lock:
+            entry = _mos_payloads.get(database)
+            if entry is None:
+                schema_version, payloads = _load_mos_payloads(database)
+                entry = (schema_version, payloads, now + MOS_DATA_CHECK_INTERVAL)
+            elif now >= entry[2]:
+                schema_version, payloads = entry[0], entry[1]
+                try:
+                    if _read_schema_version(database) != schema_version:
+                        schema_version, payloads = _load_mos_payloads(database)
+                        app.logger.info("Reloaded MOS data after a re-import.")
+                except sqlite3.Error as e:
+                    app.logger.warning(f"Could not check for re-imported MOS data: {e}")
+                entry = (schema_version, payloads, now + MOS_DATA_CHECK_INTERVAL)
+            _mos_payloads[database] = entry
+    return entry[1]
+
+@functools.lru_cache(maxsize=1024)
+def _mos_not_found_body(mos_code):
+    """
+    Builds the RFC 7807 problem details body for an unknown MOS code.
+
+    These are cached too, since repeated lookups of invalid codes are common.
+    """
+    problem = {
+        "type": "about:blank",
+        "title": "Not Found",
+        "status": 404,
+        "detail": f"The requested MOS code '{mos_code}' was not found.",
+        "instance": f"/api/mos/{mos_code}"
+    }
+    return orjson.dumps(problem)
+
 # --- Page-serving Routes ---
 
 @app.route("/")
@@ -181,20 +538,41 @@ def index():
     """
     Serves the main application page.
 
-    It queries the database for all available military occupations and passes
-    them to the `index.html` template. This populates the dropdown menu on
-    the frontend.
+    The page itself needs no database query: the occupations dropdown is
+    populated on the frontend from `static/occupations.json`, which is written
+    by the data import script.
+    """
+    return render_template("index.html", occupations_version=occupations_asset_version())
+
+def occupations_asset_version():
+    """
+    Returns a version string for the exported occupations list.
+
+    The file's modification time is added to its URL as a `v` query parameter.
+    Every import rewrites the file, so the URL changes with the data and
+    browsers and proxies fetch the new list instead of serving a cached copy
+    for up to `OCCUPATIONS_ASSET_MAX_AGE` seconds. Returns None if the file
+    has not been exported yet, which leaves the URL unversioned.
     """
     try:
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT mos_code, title FROM occupations ORDER BY title ASC")
-        occupations = cursor.fetchall()
-        return render_template("index.html", occupations=occupations)
-    except Exception as e:
-        app.logger.error(f"Failed to fetch occupations for index page: {e}")
-        # Render a simple error message if the database fails.
-        return "Error: Could not connect to the database to fetch occupations.", 500
+        return str(int(os.stat(os.path.join(app.static_folder, OCCUPATIONS_ASSET)).st_mtime))
+    except OSError:
+        return None
+
+@app.after_request
+def cache_occupations_asset(response):
+    """
+    Lets browsers and proxies cache the exported occupations list.
+
+    The file only changes when the data is re-imported, and the page links to
+    it with a versioned URL (see `occupations_asset_version`), so it can be
+    cached far longer than the other static assets.
+    """
+    if request.endpoint == 'static' and request.view_args.get('filename') == OCCUPATIONS_ASSET:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = OCCUPATIONS_ASSET_MAX_AGE
+    return response
 
 @app.route('/login')
 def login_page():
@@ -213,39 +591,57 @@ def profile_page():
 @app.route('/api/skills', methods=['GET', 'POST'])
 @login_required
 def saved_skills():
-    """Manages saved skills for the logged-in user."""
+    """
+    Manages saved skills for the logged-in user.
+
+    A POST may send `skill_description` as a single string or as a list of
+    strings. A list is saved with one `executemany` call in a single
+    transaction, so saving several skills costs one request and one commit.
+    """
     db = get_db()
     if request.method == 'POST':
         data = request.get_json()
         skill_description = data.get('skill_description')
-        if not skill_description:
-            return jsonify({'error': 'Skill description is required.'}), 400
-
-        db.execute(
-            'INSERT INTO user_saved_skills (user_id, skill_description) VALUES (?, ?)',
-            (g.user['id'], skill_description)
-        )
-        db.commit()
-        return jsonify({'message': 'Skill saved successfully'}), 201
+        user_id = get_current_user()['id']
+
+        if isinstance(skill_description, list):
+            if not skill_description or not all(
+                isinstance(skill, str) and skill for skill in skill_description
+            ):
+                return json_response({'error': 'Skill descriptions must be non-empty strings.'}, 400)
+
+            with db:
+                db.executemany(
+                    SQL_INSERT_SAVED_SKILL,
+                    [(user_id, skill) for skill in skill_description]
+                )
+            return json_response({
+                'message': 'Skills saved successfully',
+                'inserted': len(skill_description)
+            }, 201)
+
+        if not skill_description or not isinstance(skill_description, str):
+            return json_response({'error': 'Skill description is required.'}, 400)
+
+        with db:
+            db.execute(SQL_INSERT_SAVED_SKILL, (user_id, skill_description))
+        return json_response({'message': 'Skill saved successfully'}, 201)
 
     # GET request
-    skills = db.execute(
-        'SELECT id, skill_description FROM user_saved_skills WHERE user_id = ?',
-        (g.user['id'],)
-    ).fetchall()
-    return jsonify([dict(row) for row in skills])
+    skills = [
+        {'id': row[0], 'skill_description': row[1]}
+        for row in db.execute(SQL_SELECT_SAVED_SKILLS, (get_current_user()['id'],))
+    ]
+    return json_response(skills)
 
 @app.route('/api/skills/<int:skill_id>', methods=['DELETE'])
 @login_required
 def delete_skill(skill_id):
     """Deletes a saved skill."""
     db = get_db()
-    db.execute(
-        'DELETE FROM user_saved_skills WHERE id = ? AND user_id = ?',
-        (skill_id, g.user['id'])
-    )
-    db.commit()
-    return jsonify({'message': 'Skill deleted successfully'})
+    with db:
+        db.execute(SQL_DELETE_SAVED_SKILL, (skill_id, get_current_user()['id']))
+    return json_response({'message': 'Skill deleted successfully'})
 
 
 @app.route("/api/mos/<string:mos_code>")
@@ -266,47 +662,41 @@ def get_skills_for_mos(mos_code):
     Returns a 404 Not Found response that conforms to the RFC 7807 "Problem
     Details for HTTP APIs" standard. This provides a machine-readable error
     format that clients can reliably parse.
+
+    Both kinds of response body are prebuilt in memory, so a lookup skips
+    the database and JSON serialization entirely. Successful responses carry
+    an ETag, and a client that sends it back in `If-None-Match` receives an
+    empty 304 Not Modified instead of the body. Clients that send
+    `Accept-Encoding: gzip` receive the precompressed body.
     """
     try:
-        db = get_db()
-        cursor = db.cursor()
-
-        # Query for the occupation and its skills using a JOIN.
-        # This is more efficient than running two separate queries.
-        query = """
-            SELECT o.title, s.description
-            FROM occupations o
-            JOIN skills s ON o.id = s.occupation_id
-            WHERE o.mos_code = ?
-        """
-        cursor.execute(query, (mos_code,))
-        rows = cursor.fetchall()
-
-        if not rows:
-            # If the query returns no results, the MOS code is not in the database.
-            # Construct the RFC 7807 problem details response.
-            problem = {
-                "type": "about:blank",
-                "title": "Not Found",
-                "status": 404,
-                "detail": f"The requested MOS code '{mos_code}' was not found.",
-                "instance": f"/api/mos/{mos_code}"
-            }
-            # The `jsonify` function correctly sets the Content-Type header
-            # to `application/json`, but for strict RFC 7807 compliance,
-            # `application/problem+json` is preferred.
-            response = jsonify(problem)
-            response.headers['Content-Type'] = 'application/problem+json'
-            return response, 404
-
-        # Process the query results into the desired JSON structure.
-        title = rows[0]['title']
-        skills = [row['description'] for row in rows]
-
-        return jsonify({
-            "title": title,
-            "skills": skills
-        })
+        payload = get_mos_payloads().get(mos_code)
+
+        if payload is None:
+            # For strict RFC 7807 compliance, the error body is served as
+            # `application/problem+json` rather than plain `application/json`.
+            return Response(
+                _mos_not_found_body(mos_code),
+                status=404,
+                mimetype='application/problem+json'
+            )
+
+        body, gzip_body, etag = payload
+        if request.accept_encodings['gzip']:
+            response = Response(gzip_body, mimetype='application/json')
+            response.content_encoding = 'gzip'
+            # Each encoding is a different representation, so it needs its
+            # own strong ETag.
+            response.set_etag(f"{etag}-gzip")
+        else:
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = MOS_RESPONSE_MAX_AGE
+        # Turns the response into a 304 if the client's copy is current.
+        response.make_conditional(request)
+        return response
 
     except Exception as e:
         # Catch-all for other potential server errors (e.g., database connection issues).
@@ -318,12 +708,23 @@ def get_skills_for_mos(mos_code):
             "detail": "An unexpected error occurred on the server.",
             "instance": f"/api/mos/{mos_code}"
         }
-        response = jsonify(problem)
-        response.headers['Content-Type'] = 'application/problem+json'
-        return response, 500
+        return json_response(problem, 500, mimetype='application/problem+json')
+
+# --- Startup ---
+#
+# Build the MOS responses as soon as the module is imported rather than on the
+# first request. Under Gunicorn with `preload_app` this happens once in the
+# master process, and every forked worker shares the result copy-on-write.
+# A missing or outdated database is left for the first request to report.
+if os.path.exists(app.config['DATABASE']):
+    try:
+        get_mos_payloads()
+    except sqlite3.Error as e:
+        app.logger.warning(f"Could not preload MOS data: {e}")
 
 if __name__ == '__main__':
     # This block allows running the app directly for development purposes.
     # > python app.py
-    # For production, a WSGI server like Gunicorn or Waitress should be used.
+    # For production, a WSGI server like Gunicorn or Waitress should be used
+    # (see `gunicorn.conf.py`).
     app.run(debug=True)
@@ -0,0 +1,49 @@
+# ==============================================================================
+#  Gunicorn Configuration for Military Skills Translator
+# ==============================================================================
+#
+#  DESCRIPTION:
+#  Production settings for serving the Flask app with Gunicorn. Gunicorn reads
+#  this file automatically when started from the project root:
+#  > gunicorn app:app
+#
+#  DESIGN NOTES:
+#  - The app is preloaded in the master process before workers are forked.
+#    Everything `app.py` builds at import time (such as the prebuilt MOS
+#    responses) is therefore created once and shared copy-on-write by all
+#    workers, instead of being rebuilt in each one.
+#  - SQLite connections must not cross a fork, so each worker starts with an
+#    empty connection pool (see `post_fork` below).
+#  - Each worker notices re-imported data on its own within a few seconds
+#    (see `get_mos_payloads` in `app.py`), so a re-import needs no restart.
+#    Because the app is preloaded, a `HUP` re-forks workers from the master's
+#    copy of the code: code changes, or replacing the database file instead
+#    of re-importing into it, need a full restart of Gunicorn.
+#  - Each login or registration hashes the password with Argon2, which holds
+#    `PASSWORD_HASH_MEMORY_COST` (64 MiB by default) while it runs. Peak memory
+#    from hashing is therefore workers x threads x 64 MiB: with the defaults
+#    on an 8-core host that is 17 x 4 x 64 MiB, about 4.3 GiB. Lower
+#    WEB_CONCURRENCY or GUNICORN_THREADS on hosts with less memory to spare.
+#
+#  ENVIRONMENT VARIABLES:
+#  - WEB_CONCURRENCY: Number of worker processes. Defaults to (2 * CPU cores) + 1.
+#  - GUNICORN_THREADS: Number of threads per worker. Defaults to 4.
+#  - PORT: Port to listen on. Defaults to 5000.
+#
+# ==============================================================================
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+preload_app = True
+
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+def post_fork(server, worker):
+    """Gives each newly forked worker its own database connection pool."""
+    from app import reset_db_pools
+    reset_db_pools()
@@ -11,6 +11,8 @@
 #  USAGE:
 #  Run this script from the root of the project directory:
 #  > python scripts/import_data.py
+#  It can be re-run while the server is running, and exits with a non-zero
+#  status if the import fails.
 #
 #  ENVIRONMENT VARIABLES:
 #  - DATABASE_PATH: The file path for the SQLite database. This is loaded
@@ -20,13 +22,22 @@
 
 import os
 import sqlite3
+import sys
 import json
 from dotenv import load_dotenv
 
-def main():
+def main(db_path=None, occupations_path=None):
     """
     Orchestrates the database setup process: loading environment variables,
     connecting to the database, creating tables, and importing data.
+
+    Args:
+        db_path: Optional path of the database to build. Defaults to the
+            DATABASE_PATH environment variable.
+        occupations_path: Optional path to export the occupations list to.
+            Defaults to `static/occupations.json` in the project root.
+
+    Exits with status 1 if the database cannot be built.
     """
     # --- Environment Setup ---
     # Load environment variables from .env file located in the project root.
@@ -35,16 +46,17 @@ def main():
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     load_dotenv(os.path.join(project_root, '.env'))
 
-    db_path = os.getenv('DATABASE_PATH')
+    if db_path is None:
+        db_path = os.getenv('DATABASE_PATH')
 
     if not db_path:
         print("Error: DATABASE_PATH environment variable not set.")
         print("Please ensure a .env file exists in the project root with the DATABASE_PATH variable.")
-        return
+        sys.exit(1)
 
     # Ensure the instance directory exists.
     db_dir = os.path.dirname(db_path)
-    if not os.path.exists(db_dir):
+    if db_dir and not os.path.exists(db_dir):
         os.makedirs(db_dir)
         print(f"Created directory: {db_dir}")
 
@@ -52,8 +64,27 @@ def main():
     try:
         # The 'with' statement ensures the connection is automatically closed.
         with sqlite3.connect(db_path) as conn:
+            # The import rebuilds every table from data.json, so a crash part
+            # way through is recovered by simply re-running the script. That
+            # makes it safe to trade durability for speed while it runs.
+            conn.execute("PRAGMA synchronous=OFF")
+            # A database the app has already used is in WAL mode, and SQLite
+            # cannot leave WAL mode while the running server holds pooled
+            # connections to it. The journal mode is therefore only changed
+            # for databases that are not in WAL mode yet.
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            if journal_mode != 'wal':
+                conn.execute("PRAGMA journal_mode=MEMORY")
+            # Match the page size to the OS page size for memory-mapped reads.
+            # This only takes effect when the database file is first created.
+            conn.execute("PRAGMA page_size=4096")
+
+            # Manage the transaction explicitly so the whole rebuild, schema
+            # included, is applied as a single write transaction.
+            conn.isolation_level = None
             cursor = conn.cursor()
             print(f"Successfully connected to database at {db_path}")
+            cursor.execute("BEGIN IMMEDIATE")
 
             # Drop existing tables to ensure a fresh start (idempotency).
             # This is useful for development and testing.
@@ -75,13 +106,16 @@ def main():
 
             # Create the 'occupations' table.
             # This table stores the Military Occupational Specialty (MOS) codes
-            # and their corresponding titles.
+            # and their corresponding titles. `skills_json` is a denormalized
+            # copy of the occupation's skills as a JSON array, so the API can
+            # answer with a single row read instead of a JOIN.
             print("Creating 'occupations' table...")
             cursor.execute("""
                 CREATE TABLE occupations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     mos_code TEXT NOT NULL UNIQUE,
-                    title TEXT NOT NULL
+                    title TEXT NOT NULL,
+                    skills_json TEXT
                 )
             """)
 
@@ -99,6 +133,9 @@ def main():
                     FOREIGN KEY (occupation_id) REFERENCES occupations (id) ON DELETE CASCADE
                 )
             """)
+            # Index the foreign key so the occupation -> skills JOIN in the API
+            # is an index seek rather than a scan of the whole skills table.
+            cursor.execute("CREATE INDEX idx_skills_occupation_id ON skills (occupation_id)")
 
             # Create the 'user_saved_skills' table.
             # This table links users to the skills they have saved.
@@ -111,6 +148,8 @@ def main():
                     FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
                 )
             """)
+            # Saved skills are always listed and deleted per user.
+            cursor.execute("CREATE INDEX idx_user_saved_skills_user_id ON user_saved_skills (user_id)")
 
             print("Database tables created successfully.")
 
@@ -118,15 +157,26 @@ def main():
             import_data(cursor)
 
             # Commit the changes to the database.
-            conn.commit()
+            cursor.execute("COMMIT")
             print("Data committed to the database.")
 
+            # Gather table and index statistics so the query planner can make
+            # use of the indexes created above.
+            cursor.execute("ANALYZE")
+
+            export_occupations(cursor, occupations_path)
+
+    # Every failure exits with a non-zero status, so that deployment scripts
+    # and CI notice a failed import instead of carrying on with the old data.
     except sqlite3.Error as e:
         print(f"Database error: {e}")
+        sys.exit(1)
     except FileNotFoundError:
         print(f"Error: data.json not found in project root.")
+        sys.exit(1)
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+        sys.exit(1)
 
 def import_data(cursor):
     """
@@ -151,12 +201,12 @@ def import_data(cursor):
         return
 
     print(f"Importing {len(occupations_data)} occupations...")
-    for occ in occupations_data:
-        # Using parameterized queries to prevent SQL injection.
-        cursor.execute(
-            "INSERT INTO occupations (mos_code, title) VALUES (?, ?)",
-            (occ['mos'], occ['title'])
-        )
+    # Using parameterized queries to prevent SQL injection. `executemany`
+    # prepares the statement once and reuses it for every row.
+    cursor.executemany(
+        "INSERT INTO occupations (mos_code, title) VALUES (?, ?)",
+        [(occ['mos'], occ['title']) for occ in occupations_data]
+    )
     print("Occupations imported successfully.")
 
     # --- Import Skills ---
@@ -166,23 +216,64 @@ def import_data(cursor):
         return
 
     print(f"Importing skills for {len(skills_data)} occupations...")
+    # Look up the primary keys of all the occupations we just inserted at once,
+    # rather than querying for each MOS code in turn.
+    occupation_ids = dict(cursor.execute("SELECT mos_code, id FROM occupations"))
+
+    skill_rows = []
+    skills_json_rows = []
     for mos_code, skills_list in skills_data.items():
-        # First, get the primary key of the occupation we just inserted.
-        cursor.execute("SELECT id FROM occupations WHERE mos_code = ?", (mos_code,))
-        result = cursor.fetchone()
-
-        if result:
-            occupation_id = result[0]
-            for skill_desc in skills_list:
-                cursor.execute(
-                    "INSERT INTO skills (occupation_id, description) VALUES (?, ?)",
-                    (occupation_id, skill_desc)
-                )
+        occupation_id = occupation_ids.get(mos_code)
+
+        if occupation_id is not None:
+            skill_rows.extend((occupation_id, skill_desc) for skill_desc in skills_list)
+            # An occupation without skills keeps a NULL `skills_json`, so the
+            # API reports it as not found, as it does for upgraded databases.
+            if skills_list:
+                skills_json_rows.append((json.dumps(skills_list), occupation_id))
             print(f"  - Imported {len(skills_list)} skills for {mos_code}")
         else:
             print(f"  - Warning: Could not find occupation_id for {mos_code}. Skills not imported.")
 
+    cursor.executemany(
+        "INSERT INTO skills (occupation_id, description) VALUES (?, ?)",
+        skill_rows
+    )
+    # The normalized 'skills' table stays the source of truth; this copy only
+    # serves the read-only API.
+    cursor.executemany(
+        "UPDATE occupations SET skills_json = ? WHERE id = ?",
+        skills_json_rows
+    )
+
     print("\nData import process finished.")
 
+def export_occupations(cursor, json_path=None):
+    """
+    Writes the occupations list to static/occupations.json.
+
+    The frontend loads the occupation dropdown from this file, so the list is
+    served as a cacheable static asset rather than queried on every page view.
+    The file is written to a temporary path first and then moved into place,
+    so the web server never serves a partially written file.
+
+    Args:
+        cursor: A sqlite3.Cursor object to execute SQL commands.
+        json_path: Optional path to write the file to instead.
+    """
+    if json_path is None:
+        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        json_path = os.path.join(project_root, 'static', 'occupations.json')
+
+    cursor.execute("SELECT mos_code, title FROM occupations ORDER BY title ASC")
+    occupations = [{'mos': mos_code, 'title': title} for mos_code, title in cursor]
+
+    tmp_path = f"{json_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(occupations, f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, json_path)
+    print(f"Exported {len(occupations)} occupations to {json_path}")
+
 if __name__ == "__main__":
     main()
@@ -9,9 +9,9 @@
 //  accessible manner.
 //
 //  PRINCIPLES APPLIED:
-//  - Progressive Enhancement: The core content (list of occupations) is
-//    available without JavaScript. This script enhances the experience by
-//    adding dynamic skill loading.
+//  - Cacheable Data: The list of occupations is loaded from a static JSON
+//    file generated at import time, so it can be cached by the browser and
+//    any reverse proxy instead of being rendered on every page load.
 //  - Accessibility (a11y): Follows ARIA patterns for asynchronous updates,
 //    focus management, and live announcements.
 //  - Security: Exclusively uses `.textContent` and template elements to
@@ -72,6 +72,40 @@ document.addEventListener('DOMContentLoaded', () => {
 
     searchInput.addEventListener('input', filterOccupations);
 
+    // --- 4. Load Occupations ---
+    loadOccupations();
+
+    /**
+     * Populates the occupation dropdown from the static occupations file.
+     */
+    async function loadOccupations() {
+        try {
+            const response = await fetch(mosSelect.dataset.source);
+
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+
+            const occupations = await response.json();
+            const fragment = new DocumentFragment();
+
+            occupations.forEach(({ mos, title }) => {
+                // Security: Use textContent, not innerHTML, to prevent XSS.
+                const option = document.createElement('option');
+                option.value = mos;
+                option.textContent = `${title} (${mos})`;
+                fragment.appendChild(option);
+            });
+
+            mosSelect.appendChild(fragment);
+
+            // Apply any filter the user typed while the list was loading.
+            filterOccupations();
+        } catch (error) {
+            console.error('Failed to load occupations:', error);
+            announceToScreenReader('An error occurred while loading occupations.');
+        }
+    }
 
     /**
      * Filters the occupation dropdown based on user input.
@@ -0,0 +1,170 @@
+# ==============================================================================
+#  Shared Pytest Fixtures
+# ==============================================================================
+#
+#  DESCRIPTION:
+#  pytest loads this file once, before collecting any test module in this
+#  directory. The fixtures defined here (the test database, the Flask app and
+#  its test client) are therefore shared by every test module without each
+#  one having to define or import them.
+#
+# ==============================================================================
+
+import pytest
+import sys
+import os
+import sqlite3
+
+# This is a common pattern for making a package's modules available for testing
+# when the test suite is located in a subdirectory.
+# We add the project's root directory to Python's path. Doing it here means it
+# happens once per test run, before any test module imports the app.
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app import app as flask_app # Import the Flask app instance
+
+# The tests run against a named, shared-cache in-memory database, so no test
+# ever touches the disk. Every connection opened with this URI in the same
+# process sees the same database, for as long as at least one of them is open.
+# Each pytest-xdist worker is a separate process, and so gets its own copy.
+TEST_DATABASE_URI = "file:vst_test?mode=memory&cache=shared"
+
+# --- Pytest Fixtures ---
+
+@pytest.fixture(scope="session")
+def db_template(tmp_path_factory):
+    """
+    Builds a template database from data.json once per test session.
+
+    Importing the data means parsing the JSON and running the inserts; every
+    database the tests need afterwards is copied from this template. The
+    occupations export is written next to it, so running the tests never
+    modifies `static/occupations.json` in the source tree.
+    """
+    directory = tmp_path_factory.mktemp("db")
+    path = str(directory / "template.sqlite")
+
+    from scripts.import_data import main as init_db
+    init_db(path, str(directory / "occupations.json"))
+    return path
+
+@pytest.fixture(scope="session")
+def database(db_template):
+    """
+    Loads the template into this session's in-memory database and returns its URI.
+
+    The template is copied with SQLite's backup API. The connection opened
+    here is held for the whole session, since an in-memory database is
+    discarded as soon as its last connection closes.
+    """
+    keeper = sqlite3.connect(TEST_DATABASE_URI, uri=True)
+    template = sqlite3.connect(db_template)
+    template.backup(keeper)
+    template.close()
+
+    yield TEST_DATABASE_URI
+
+    keeper.close()
+
+@pytest.fixture(scope="session")
+def app(database):
+    """
+    A pytest fixture that provides the Flask app instance for the tests.
+    It also configures the app for testing, pointing it at this session's
+    database. Configuring the app is idempotent, so it is done once per
+    session rather than for every test.
+    """
+    # Set the TESTING flag to True. This can disable error catching during
+    # request handling, so that you get better error reports when performing
+    # test requests against the application.
+    flask_app.config.update({
+        "TESTING": True,
+        # Use the cheapest Argon2 parameters allowed. Production-strength
+        # hashing would otherwise dominate the run time of every auth test.
+        "PASSWORD_HASH_TIME_COST": 1,
+        "PASSWORD_HASH_MEMORY_COST": 8,
+    })
+
+    flask_app.config['DATABASE'] = database
+
+    yield flask_app
+
+@pytest.fixture(scope="module")
+def client(app):
+    """
+    A pytest fixture that configures and provides a test client for the Flask app.
+
+    The test client allows us to send HTTP requests to the application without
+    having to run it on a live web server. This is the standard way to test
+    Flask applications. One client is shared by all the tests in a module;
+    `_clear_client_session` empties its session after each test, so a login
+    never leaks from one test into the next.
+    """
+    return app.test_client()
+
+@pytest.fixture(autouse=True)
+def _clear_client_session(request):
+    """Clears the shared test client's session after each test that used it."""
+    yield
+
+    if "client" in request.fixturenames:
+        with request.getfixturevalue("client").session_transaction() as session:
+            session.clear()
+
+@pytest.fixture
+def runner(app):
+    """A fixture that provides a test runner that can be used to invoke CLI commands."""
+    return app.test_cli_runner()
+
+class TransactionBoundConnection:
+    """
+    Wraps a connection whose transaction is owned by a test fixture.
+
+    The app's commits become no-ops, so every write stays inside the fixture's
+    transaction until it is rolled back. A `with db:` block maps to a
+    SAVEPOINT, so a failed write still only undoes its own changes. All other
+    attributes are passed through to the real connection.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def __enter__(self):
+        self._conn.execute("SAVEPOINT app_write")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self._conn.execute("ROLLBACK TO app_write")
+        self._conn.execute("RELEASE app_write")
+        return False
+
+@pytest.fixture(autouse=True)
+def _db_txn(app, database):
+    """
+    Runs each test inside a database transaction that is rolled back afterwards.
+
+    The database is only built once per session (see `db_template`); rolling back
+    restores it to that state, so every test still starts from clean data
+    without paying for a full re-import.
+    """
+    conn = sqlite3.connect(database, detect_types=sqlite3.PARSE_DECLTYPES, uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute("BEGIN")
+    app.config['DATABASE_CONNECTION'] = TransactionBoundConnection(conn)
+
+    yield
+
+    app.config['DATABASE_CONNECTION'] = None
+    conn.rollback()
+    conn.close()
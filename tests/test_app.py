@@ -18,73 +18,44 @@
 # ==============================================================================
 
 import pytest
+import gzip
 import json
-import sys
-import os
+import re
+import shutil
+import sqlite3
 
-# This is a common pattern for making a package's modules available for testing
-# when the test suite is located in a subdirectory.
-# We add the project's root directory to Python's path.
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from app import app as flask_app # Import the Flask app instance
+from flask import g
+from app import get_db
+from werkzeug.security import generate_password_hash
 
 # --- Pytest Fixtures ---
+# The database, app, client and runner fixtures are shared across test modules
+# and live in tests/conftest.py.
 
-@pytest.fixture
-def app():
-    """
-    A pytest fixture that provides the Flask app instance for the tests.
-    It also configures the app for testing, ensuring the database path
-    is correctly resolved.
+@pytest.fixture(scope="module")
+def registered_user(app, database):
     """
-    # Set the TESTING flag to True. This can disable error catching during
-    # request handling, so that you get better error reports when performing
-    # test requests against the application.
-    flask_app.config.update({
-        "TESTING": True,
-    })
-
-    # The DATABASE_PATH in .env is relative ('instance/database.sqlite').
-    # When pytest runs, the current working directory may not be the project root,
-    # causing the relative path to fail. Here, we create an absolute path
-    # to the database and override the config for the test session.
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    db_path = os.path.join(project_root, os.getenv('DATABASE_PATH'))
-    flask_app.config['DATABASE'] = db_path
-
+    Registers one user for the whole module and returns `(username, password)`.
 
-    yield flask_app
-
-@pytest.fixture
-def client(app):
+    Password hashing is deliberately slow, so tests that only need an existing
+    account share this one instead of each registering their own. Being
+    module-scoped, it is set up before the per-test transaction is opened, so
+    the user is committed and visible to every test in the module. It is
+    deleted again when the module finishes.
     """
-    A pytest fixture that configures and provides a test client for the Flask app.
+    username, password = 'authuser', 'password'
+    response = app.test_client().post('/api/register', json={
+        'username': username,
+        'password': password
+    })
+    assert response.status_code == 201
 
-    The test client allows us to send HTTP requests to the application without
-    having to run it on a live web server. This is the standard way to test
-#    Flask applications.
-    """
-    # This client can be used to make requests that don't modify the session,
-    # like simple GET requests.
-    return app.test_client()
+    yield username, password
 
-@pytest.fixture
-def runner(app):
-    """
-    A fixture that provides a test runner that can be used to invoke CLI commands.
-    We also use this opportunity to initialize the database for a clean slate
-    before tests run.
-    """
-    # Before yielding, we set up the database.
-    # This ensures every test function gets a clean database.
     with app.app_context():
-        # This is a simplified way to re-initialize the db for tests.
-        # In a larger app, you might use a dedicated test database or transactions.
-        from scripts.import_data import main as init_db
-        init_db()
-
-    return app.test_cli_runner()
+        db = get_db()
+        with db:
+            db.execute("DELETE FROM users WHERE username = ?", (username,))
 
 # --- Authentication Test Cases ---
 
@@ -106,39 +77,39 @@ def test_register(client):
     assert response.status_code == 400
     assert 'already registered' in response.get_json()['error']
 
-def test_login_logout(client):
+def test_login_logout(app, client, registered_user):
     """Test user login and logout."""
-    # First, register a user to test with
-    client.post('/api/register', json={'username': 'loginuser', 'password': 'password'})
+    username, password = registered_user
 
     # Test successful login
     response = client.post('/api/login', json={
-        'username': 'loginuser',
-        'password': 'password'
+        'username': username,
+        'password': password
     })
     assert response.status_code == 200
     assert 'Logged in successfully' in response.get_json()['message']
 
     # After login, a session cookie should be set.
-    # We can check this by making a request to a protected route.
-    response = client.get('/api/skills')
-    assert response.status_code == 200 # Should succeed
+    session_cookie = app.config['SESSION_COOKIE_NAME']
+    assert client.get_cookie(session_cookie) is not None
 
     # Test logout
     response = client.get('/api/logout')
     assert response.status_code == 200
 
-    # After logout, the session should be cleared.
+    # After logout, the session cookie should be removed and protected
+    # routes should reject the client again.
+    assert client.get_cookie(session_cookie) is None
     response = client.get('/api/skills')
     assert response.status_code == 401 # Should fail with Unauthorized
 
-def test_login_invalid_credentials(client):
+def test_login_invalid_credentials(client, registered_user):
     """Test login with incorrect credentials."""
-    client.post('/api/register', json={'username': 'creduser', 'password': 'password'})
+    username, password = registered_user
 
     # Test with incorrect password
     response = client.post('/api/login', json={
-        'username': 'creduser',
+        'username': username,
         'password': 'wrongpassword'
     })
     assert response.status_code == 400
@@ -147,11 +118,72 @@ def test_login_invalid_credentials(client):
     # Test with incorrect username
     response = client.post('/api/login', json={
         'username': 'wronguser',
-        'password': 'password'
+        'password': password
     })
     assert response.status_code == 400
     assert 'Incorrect username' in response.get_json()['error']
 
+def test_login_upgrades_legacy_password_hash(app, client):
+    """Test that a legacy werkzeug hash is re-hashed with Argon2 on login."""
+    with app.app_context():
+        db = get_db()
+        db.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+            ('legacyuser', generate_password_hash('password', method='pbkdf2:sha256:1000'))
+        )
+        db.commit()
+
+    response = client.post('/api/login', json={
+        'username': 'legacyuser',
+        'password': 'password'
+    })
+    assert response.status_code == 200
+
+    with app.app_context():
+        password_hash = get_db().execute(
+            "SELECT password_hash FROM users WHERE username = ?", ('legacyuser',)
+        ).fetchone()['password_hash']
+    assert password_hash.startswith('$argon2id$')
+
+def test_save_multiple_skills(client):
+    """Test saving a list of skills in a single request."""
+    client.post('/api/register', json={'username': 'bulkuser', 'password': 'password'})
+    client.post('/api/login', json={'username': 'bulkuser', 'password': 'password'})
+
+    response = client.post('/api/skills', json={
+        'skill_description': ['First skill', 'Second skill']
+    })
+    assert response.status_code == 201
+    assert response.get_json()['inserted'] == 2
+
+    saved = [skill['skill_description'] for skill in client.get('/api/skills').get_json()]
+    assert saved == ['First skill', 'Second skill']
+
+    # An empty list is rejected.
+    response = client.post('/api/skills', json={'skill_description': []})
+    assert response.status_code == 400
+
+
+def test_pages_load_user_only_when_shown(client, registered_user):
+    """
+    Tests that page renders only load the logged-in user when they show it.
+
+    Scenario: A logged-in client requests the login page, which does not show
+              the user, and then the main page, which greets them by name.
+    Expectation: Rendering the login page does not load the user, while the
+                 main page loads it and shows the username.
+    """
+    username, password = registered_user
+    client.post('/api/login', json={'username': username, 'password': password})
+
+    with client:
+        assert client.get('/login').status_code == 200
+        assert 'user' not in g
+
+    with client:
+        response = client.get('/')
+        assert 'user' in g
+    assert f"Welcome, {username}".encode() in response.data
 
 # --- API Test Cases ---
 
@@ -178,6 +210,38 @@ def test_get_skills_success(client):
     assert len(data['skills']) == 4 # Based on our sample data.json
     assert "Operated and maintained a variety of small arms and heavy weapons, ensuring operational readiness for missions." in data['skills']
 
+def test_get_skills_not_modified(client):
+    """
+    Tests that a repeat request with a matching ETag is answered with a 304.
+
+    Scenario: A GET request is made to /api/mos/11B, then repeated with the
+              returned ETag in the If-None-Match header.
+    Expectation: The first response carries an ETag, and the second response
+                 is a 304 Not Modified with an empty body.
+    """
+    response = client.get("/api/mos/11B")
+    etag = response.headers['ETag']
+    assert etag
+
+    response = client.get("/api/mos/11B", headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+def test_get_skills_gzip(client):
+    """
+    Tests that clients accepting gzip receive the precompressed body.
+
+    Scenario: A GET request is made to /api/mos/11B with Accept-Encoding: gzip.
+    Expectation: The response is gzip-encoded, varies on Accept-Encoding, and
+                 decompresses to the same payload as the uncompressed response.
+    """
+    response = client.get("/api/mos/11B", headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == client.get("/api/mos/11B").get_json()
+
 def test_get_skills_not_found(client):
     """
     Tests the API's behavior when a non-existent MOS code is requested.
@@ -201,6 +265,84 @@ def test_get_skills_not_found(client):
     assert "The requested MOS code 'XYZ' was not found." in problem_details['detail']
     assert problem_details['instance'] == "/api/mos/XYZ"
 
+def test_get_skills_upgrades_old_schema(app, client, db_template, tmp_path):
+    """
+    Tests that a database created by an older import script is upgraded.
+
+    Scenario: The app is pointed at a copy of the test database without the
+              `occupations.skills_json` column or the indexes but with a
+              registered user, and a GET request is made to /api/mos/11B.
+    Expectation: The server responds with a 200 OK status and the MOS data,
+                 the column and indexes are added, and the user account is
+                 kept.
+    """
+    path = str(tmp_path / "old_schema.sqlite")
+    shutil.copy(db_template, path)
+    with sqlite3.connect(path) as conn:
+        conn.execute("ALTER TABLE occupations DROP COLUMN skills_json")
+        conn.execute("DROP INDEX idx_skills_occupation_id")
+        conn.execute("DROP INDEX idx_user_saved_skills_user_id")
+        conn.execute(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+            ('olduser', generate_password_hash('password', method='pbkdf2:sha256:1000'))
+        )
+
+    database = app.config['DATABASE']
+    app.config['DATABASE'] = path
+    try:
+        response = client.get("/api/mos/11B")
+    finally:
+        app.config['DATABASE'] = database
+
+    assert response.status_code == 200
+    assert response.get_json()['title'] == "Infantryman (Army)"
+    assert len(response.get_json()['skills']) == 4
+
+    with sqlite3.connect(path) as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(occupations)")]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        users = conn.execute("SELECT username FROM users").fetchall()
+    assert 'skills_json' in columns
+    assert {'idx_skills_occupation_id', 'idx_user_saved_skills_user_id'} <= indexes
+    assert users == [('olduser',)]
+
+def test_get_skills_reloads_reimported_data(app, client, db_template, tmp_path, monkeypatch):
+    """
+    Tests that re-imported MOS data is served without restarting the app.
+
+    Scenario: The app is pointed at a copy of the test database and a user is
+              registered, leaving a connection in the app's pool. The data is
+              changed so that 11B has an outdated title, and /api/mos/11B is
+              requested. The import script is then run against the database
+              and the request is repeated.
+    Expectation: The import succeeds even though the app holds a pooled
+                 connection to the database, and the second request serves
+                 the freshly imported title.
+    """
+    path = str(tmp_path / "reimport.sqlite")
+    shutil.copy(db_template, path)
+    monkeypatch.setattr('app.MOS_DATA_CHECK_INTERVAL', 0)
+    monkeypatch.setitem(app.config, 'DATABASE', path)
+    # Use the app's own connection pool rather than the per-test transaction.
+    monkeypatch.setitem(app.config, 'DATABASE_CONNECTION', None)
+
+    response = client.post('/api/register', json={
+        'username': 'reimportuser',
+        'password': 'password'
+    })
+    assert response.status_code == 201
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE occupations SET title = 'Outdated title' WHERE mos_code = '11B'")
+    assert client.get("/api/mos/11B").get_json()['title'] == 'Outdated title'
+
+    from scripts.import_data import main as init_db
+    init_db(path, str(tmp_path / "occupations.json"))
+
+    response = client.get("/api/mos/11B")
+    assert response.status_code == 200
+    assert response.get_json()['title'] == "Infantryman (Army)"
+
 def test_root_path(client):
     """
     Tests that the root path ('/') returns a successful HTML response.
@@ -219,3 +361,26 @@ def test_root_path(client):
     # Assert: Check for some expected content in the HTML body.
     # This confirms that the template is rendering.
     assert b"Military Skills Translator" in response.data
+
+def test_occupations_asset(client):
+    """
+    Tests that the exported occupations list is served as a cacheable asset.
+
+    Scenario: The main page is requested, then a GET request is made to the
+              occupations list URL it links to.
+    Expectation: The URL carries a version parameter, and the server responds
+                 with a 200 OK status, a public Cache-Control header, and a
+                 JSON list of occupations.
+    """
+    page = client.get("/").get_data(as_text=True)
+    source = re.search(r'data-source="([^"]+)"', page).group(1)
+    assert source.startswith("/static/occupations.json?v=")
+
+    response = client.get(source)
+
+    assert response.status_code == 200
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 3600
+
+    occupations = response.get_json()
+    assert {'mos': '11B', 'title': 'Infantryman (Army)'} in occupations